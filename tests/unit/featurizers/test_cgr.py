@@ -1,3 +1,4 @@
+from functools import lru_cache
 import random
 from typing import NamedTuple
 import uuid
@@ -23,26 +24,41 @@ def expected_aliases():
     return AVAILABLE_RXN_MODE_NAMES
 
 
-@pytest.fixture(params=AVAILABLE_RXN_MODE_NAMES)
+@pytest.fixture(scope="module", params=AVAILABLE_RXN_MODE_NAMES)
 def mode_name(request):
     return request.param
 
 
-@pytest.fixture(params=AVAILABLE_RXN_MODE_NAMES[::2])
+@pytest.fixture(scope="module", params=AVAILABLE_RXN_MODE_NAMES[::2])
 def mode_imbalanced(request):
     return request.param
 
 
-@pytest.fixture(params=AVAILABLE_RXN_MODE_NAMES[1::2])
+@pytest.fixture(scope="module", params=AVAILABLE_RXN_MODE_NAMES[1::2])
 def mode_balanced(request):
     return request.param
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def rxn_mode(mode_name):
     return getattr(RxnMode, mode_name)
 
 
+@pytest.fixture(scope="module")
+def cgr_featurizer(rxn_mode):
+    return CGRFeaturizer(mode_=rxn_mode)
+
+
+@pytest.fixture(scope="module")
+def cgr_featurizer_imbalanced(mode_imbalanced):
+    return CGRFeaturizer(mode_=mode_imbalanced)
+
+
+@pytest.fixture(scope="module")
+def cgr_featurizer_balanced(mode_balanced):
+    return CGRFeaturizer(mode_=mode_balanced)
+
+
 @pytest.fixture(params=[str(uuid.uuid4()) for _ in range(3)])
 def invalid_alias(request):
     return request.param
@@ -136,8 +152,57 @@ bond_expect_balanced.update(
 bond = make_mol("[CH3:1][H:2]", keep_h=True, add_h=False).GetBondWithIdx(0)
 
 
+@lru_cache
+def _make_mol(smi: str):
+    """memoized :func:`make_mol` so each SMILES is only parsed once across all parametrizations.
+    The returned molecules are shared, so tests must not mutate them"""
+    return make_mol(smi, keep_h=True, add_h=False)
+
+
 def get_reac_prod(rxn_smi: str) -> list:
-    return [make_mol(smi, keep_h=True, add_h=False) for smi in rxn_smi.split(">>")]
+    return [_make_mol(smi) for smi in rxn_smi.split(">>")]
+
+
+def get_bonds_none(
+    featurizer: CGRFeaturizer, reac, prod, ri2pj, pids, bond_expects: list[BondExpectation]
+) -> tuple[np.ndarray, np.ndarray]:
+    """whether the reactant- and product-side bonds returned by `_get_bonds` are None for each
+    expected bond, along with the expected values"""
+    bonds_none = np.array(
+        [
+            [
+                b is None
+                for b in featurizer._get_bonds(
+                    reac, prod, ri2pj, pids, reac.GetNumAtoms(), *bond_expect.bond
+                )
+            ]
+            for bond_expect in bond_expects
+        ],
+        dtype=bool,
+    )
+    bonds_none_expected = np.array(
+        [[b.bond_reac_none, b.bond_prod_none] for b in bond_expects], dtype=bool
+    )
+
+    return bonds_none, bonds_none_expected
+
+
+@lru_cache
+def get_atomic_num_features(rxn_smi: str, atomic_nums: tuple[int, ...]) -> np.ndarray:
+    """the expected atomic number features of the CGR node feature matrix given the atomic numbers
+    of the atom featurizer. These don't depend on the `RxnMode`, so they're only calculated once per
+    reaction. The returned array is shared and read-only"""
+    reac, prod = get_reac_prod(rxn_smi)
+    _, pids, _ = CGRFeaturizer.map_reac_to_prod(reac, prod)
+    atoms = list(reac.GetAtoms()) + [prod.GetAtomWithIdx(pid) for pid in pids]
+
+    X = np.zeros((len(atoms), len(atomic_nums) + 1))
+    for i, a in enumerate(atoms):
+        Z = a.GetAtomicNum()
+        X[i, atomic_nums.index(Z) if Z in atomic_nums else len(atomic_nums)] = 1
+    X.setflags(write=False)
+
+    return X
 
 
 def randomize_case(s: str) -> str:
@@ -252,99 +317,86 @@ class TestCondensedGraphOfReactionFeaturizer:
         reac, prod = get_reac_prod(rxn_smi)
         assert CGRFeaturizer.map_reac_to_prod(reac, prod) == reac_prod_maps[rxn_smi]
 
-    def test_calc_node_feature_matrix_shape(self, rxn_smi, mode_name):
+    def test_calc_node_feature_matrix_shape(self, rxn_smi, cgr_featurizer):
         """
         Test that the calc_node_feature_matrix method returns the correct node feature matrix.
         """
-        featurizer = CGRFeaturizer(mode_=mode_name)
 
         reac, prod = get_reac_prod(rxn_smi)
-        ri2pj, pids, rids = featurizer.map_reac_to_prod(reac, prod)
+        ri2pj, pids, rids = cgr_featurizer.map_reac_to_prod(reac, prod)
 
-        num_nodes, atom_fdim = featurizer._calc_node_feature_matrix(
+        num_nodes, atom_fdim = cgr_featurizer._calc_node_feature_matrix(
             reac, prod, ri2pj, pids, rids
         ).shape
         assert num_nodes == len(ri2pj) + len(pids) + len(rids)
-        assert atom_fdim == featurizer.atom_fdim
+        assert atom_fdim == cgr_featurizer.atom_fdim
 
-    def test_calc_node_feature_matrix_atomic_number_features(self, rxn_smi, rxn_mode):
+    def test_calc_node_feature_matrix_atomic_number_features(self, rxn_smi, cgr_featurizer):
         """
         Test that the calc_node_feature_matrix method returns the correct feature matrix for the atomic number features.
         """
-        featurizer = CGRFeaturizer(mode_=rxn_mode)
         reac, prod = get_reac_prod(rxn_smi)
-        ri2pj, pids, rids = featurizer.map_reac_to_prod(reac, prod)
-        atom_featurizer = featurizer.atom_featurizer
-
-        atomic_num_features_expected = np.array(
-            [atom_featurizer.num_only(a) for a in reac.GetAtoms()]
-            + [atom_featurizer.num_only(prod.GetAtomWithIdx(pid)) for pid in pids]
-        )[
-            :, : len(atom_featurizer.atomic_nums) + 1
-        ]  # only create and keep the atomic number features
-
-        atomic_num_features = featurizer._calc_node_feature_matrix(reac, prod, ri2pj, pids, rids)[
-            :, : len(atom_featurizer.atomic_nums) + 1
-        ]
+        ri2pj, pids, rids = cgr_featurizer.map_reac_to_prod(reac, prod)
+
+        atomic_num_features_expected = get_atomic_num_features(
+            rxn_smi, tuple(cgr_featurizer.atom_featurizer.atomic_nums)
+        )
+        atomic_num_features = cgr_featurizer._calc_node_feature_matrix(
+            reac, prod, ri2pj, pids, rids
+        )[:, : len(cgr_featurizer.atom_featurizer.atomic_nums) + 1]
 
         np.testing.assert_equal(atomic_num_features, atomic_num_features_expected)
 
-    def test_get_bonds_imbalanced(self, rxn_smi, mode_imbalanced):
+    def test_get_bonds_imbalanced(self, rxn_smi, cgr_featurizer_imbalanced):
         """
         Test that the get_bonds method returns the correct bonds when modes are imbalanced.
         """
-        featurizer = CGRFeaturizer(mode_=mode_imbalanced)
         reac, prod = get_reac_prod(rxn_smi)
-        ri2pj, pids, _ = featurizer.map_reac_to_prod(reac, prod)
+        ri2pj, pids, _ = cgr_featurizer_imbalanced.map_reac_to_prod(reac, prod)
 
-        for bond_expect in bond_expect_imbalanced[rxn_smi]:
-            bond_reac, bond_prod = featurizer._get_bonds(
-                reac, prod, ri2pj, pids, reac.GetNumAtoms(), *bond_expect.bond
+        np.testing.assert_array_equal(
+            *get_bonds_none(
+                cgr_featurizer_imbalanced, reac, prod, ri2pj, pids, bond_expect_imbalanced[rxn_smi]
             )
-            assert (bond_reac is None) == bond_expect.bond_reac_none
-            assert (bond_prod is None) == bond_expect.bond_prod_none
+        )
 
-    def test_get_bonds_balanced(self, rxn_smi, mode_balanced):
+    def test_get_bonds_balanced(self, rxn_smi, cgr_featurizer_balanced):
         """
         Test that the get_bonds method returns the correct bonds when modes are balanced.
         """
-        featurizer = CGRFeaturizer(mode_=mode_balanced)
         reac, prod = get_reac_prod(rxn_smi)
-        ri2pj, pids, _ = featurizer.map_reac_to_prod(reac, prod)
+        ri2pj, pids, _ = cgr_featurizer_balanced.map_reac_to_prod(reac, prod)
 
-        for bond_expect in bond_expect_balanced[rxn_smi]:
-            bond_reac, bond_prod = featurizer._get_bonds(
-                reac, prod, ri2pj, pids, reac.GetNumAtoms(), *bond_expect.bond
+        np.testing.assert_array_equal(
+            *get_bonds_none(
+                cgr_featurizer_balanced, reac, prod, ri2pj, pids, bond_expect_balanced[rxn_smi]
             )
-            assert (bond_reac is None) == bond_expect.bond_reac_none
-            assert (bond_prod is None) == bond_expect.bond_prod_none
+        )
 
     @pytest.mark.parametrize(
         "reac_prod_bonds", [(bond, bond), (bond, None), (None, bond), (None, None)]
     )
-    def test_calc_edge_feature_shape(self, reac_prod_bonds, rxn_mode):
+    def test_calc_edge_feature_shape(self, reac_prod_bonds, cgr_featurizer):
         """
         Test that the calc_edge_feature method returns the correct edge feature.
         """
-        featurizer = CGRFeaturizer(mode_=rxn_mode)
         reac_bond, prod_bond = reac_prod_bonds
 
-        assert featurizer._calc_edge_feature(reac_bond, prod_bond).shape == (
-            len(featurizer.bond_featurizer) * 2,
+        assert cgr_featurizer._calc_edge_feature(reac_bond, prod_bond).shape == (
+            len(cgr_featurizer.bond_featurizer) * 2,
         )
 
-    def test_featurize_balanced(self, rxn_smi, mode_balanced):
+    def test_featurize_balanced(self, rxn_smi, cgr_featurizer_balanced):
         """
         Test CGR featurizer returns the correct features with balanced modes.
         """
-        featurizer = CGRFeaturizer(mode_=mode_balanced)
         reac, prod = get_reac_prod(rxn_smi)
-        ri2pj, pids, rids = featurizer.map_reac_to_prod(reac, prod)
+        ri2pj, pids, rids = cgr_featurizer_balanced.map_reac_to_prod(reac, prod)
 
-        molgraph = featurizer((reac, prod))
+        molgraph = cgr_featurizer_balanced((reac, prod))
 
         n_atoms = len(ri2pj) + len(pids) + len(rids)
-        atom_fdim = featurizer.atom_fdim
+        atom_fdim = cgr_featurizer_balanced.atom_fdim
 
         assert molgraph.V.shape == (n_atoms, atom_fdim)
 
@@ -353,7 +405,7 @@ class TestCondensedGraphOfReactionFeaturizer:
             for b in bond_expect_balanced[rxn_smi]
             if not (b.bond_reac_none and b.bond_prod_none)
         ]
-        bond_fdim = featurizer.bond_fdim
+        bond_fdim = cgr_featurizer_balanced.bond_fdim
 
         assert molgraph.E.shape == (len(bonds) * 2, bond_fdim)
 
@@ -369,18 +421,17 @@ class TestCondensedGraphOfReactionFeaturizer:
         assert np.array_equal(molgraph.edge_index, expect_edge_index)
         assert np.array_equal(molgraph.rev_edge_index, expect_rev_edge_index)
 
-    def test_featurize_imbalanced(self, rxn_smi, mode_imbalanced):
+    def test_featurize_imbalanced(self, rxn_smi, cgr_featurizer_imbalanced):
         """
         Test CGR featurizer returns the correct features with balanced modes.
         """
-        featurizer = CGRFeaturizer(mode_=mode_imbalanced)
         reac, prod = get_reac_prod(rxn_smi)
-        ri2pj, pids, rids = featurizer.map_reac_to_prod(reac, prod)
+        ri2pj, pids, rids = cgr_featurizer_imbalanced.map_reac_to_prod(reac, prod)
 
-        molgraph = featurizer((reac, prod))
+        molgraph = cgr_featurizer_imbalanced((reac, prod))
 
         n_atoms = len(ri2pj) + len(pids) + len(rids)
-        atom_fdim = featurizer.atom_fdim
+        atom_fdim = cgr_featurizer_imbalanced.atom_fdim
 
         assert molgraph.V.shape == (n_atoms, atom_fdim)
 
@@ -389,7 +440,7 @@ class TestCondensedGraphOfReactionFeaturizer:
             for b in bond_expect_imbalanced[rxn_smi]
             if not (b.bond_reac_none and b.bond_prod_none)
         ]
-        bond_fdim = featurizer.bond_fdim
+        bond_fdim = cgr_featurizer_imbalanced.bond_fdim
 
         assert molgraph.E.shape == (len(bonds) * 2, bond_fdim)
 